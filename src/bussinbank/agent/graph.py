@@ -1,29 +1,77 @@
 from __future__ import annotations
 
+import asyncio
+import json
 import os
+import re
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import TYPE_CHECKING
 
-from langgraph.graph import StateGraph, START, END
-from langgraph.prebuilt import ToolNode, tools_condition
-from langgraph.checkpoint.memory import MemorySaver
+from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage, SystemMessage, ToolMessage
 
-from langchain_groq import ChatGroq
-from langchain_core.messages import HumanMessage, SystemMessage
-
-from bussinbank.agent.state import AgentState
 from bussinbank.tools.finance_tools import TOOLS
 from bussinbank.agent.prompts import SYSTEM_PROMPT
+from bussinbank.core.ledger import DATA_DIR, ledger
+from bussinbank.memory.semantic_cache import SemanticCache
 from dotenv import load_dotenv
 load_dotenv()
 
+if TYPE_CHECKING:
+    from bussinbank.agent.state import AgentState
 
-# LLM
-llm = ChatGroq(
-    model="llama-3.1-8b-instant",
-    temperature=0.6,
-    api_key=os.getenv("GROQ_API_KEY"),
-)
+# langchain_groq and langgraph take seconds to import — nothing below touches
+# them until the first question, so importing this module stays cheap.
+
+
+@lru_cache(maxsize=2)
+def _llm_with_tools(tool_choice: str):
+    from langchain_groq import ChatGroq
+
+    llm = ChatGroq(
+        model="llama-3.1-8b-instant",
+        temperature=0.6,
+        api_key=os.getenv("GROQ_API_KEY"),
+    )
+    return llm.bind_tools(TOOLS, tool_choice=tool_choice)
+
+
+TOOLS_BY_NAME = {t.name: t for t in TOOLS}
+
+# Built once at import; init_node checkpoints it into the thread exactly once.
+SYSTEM_MSG = SystemMessage(content=SYSTEM_PROMPT, id="system")
+
+# Questions of history kept in the thread. Every Groq call re-sends the
+# whole thread, so this bounds both latency and context size.
+MAX_TURNS = 10
 
-llm_with_tools = llm.bind_tools(TOOLS)
+
+def _turn_start(messages) -> int:
+    """Index of the oldest message to keep — always a HumanMessage, so tool
+    calls are never separated from their results."""
+    humans = [i for i, m in enumerate(messages) if isinstance(m, HumanMessage)]
+    return humans[-MAX_TURNS] if len(humans) > MAX_TURNS else 0
+
+
+def init_node(state: AgentState):
+    """
+    Pins the system prompt to the front of a new thread and drops turns
+    beyond MAX_TURNS. Most turns find nothing to do and pass straight through.
+    """
+    messages = state["messages"]
+    start = _turn_start(messages)
+    if isinstance(messages[0], SystemMessage) and messages[0].content == SYSTEM_PROMPT:
+        # Keep the prompt (index 0), drop whole turns older than the cap
+        return {"messages": [RemoveMessage(id=m.id) for m in messages[1:start]]}
+
+    from langgraph.graph.message import REMOVE_ALL_MESSAGES
+
+    # add_messages only appends, so rewrite the history with the prompt first.
+    # A checkpointed thread may still carry an older prompt — swap it out.
+    history = [m for m in messages[start:] if not isinstance(m, SystemMessage)]
+    return {"messages": [RemoveMessage(id=REMOVE_ALL_MESSAGES), SYSTEM_MSG, *history]}
 
 
 def agent_node(state: AgentState):
@@ -31,60 +79,235 @@ def agent_node(state: AgentState):
     The agent calls the LLM, potentially triggering tool use or a final answer.
     """
     messages = state["messages"]
-    # Prepend the system prompt only at the beginning of a new thread
-    # or if the LLM hasn't been given instructions yet.
-    if messages and not isinstance(messages[0], SystemMessage):
-        messages = [SystemMessage(content=SYSTEM_PROMPT)] + messages
 
-    response = llm_with_tools.invoke(messages)
+    # Once this question has tool results, the model can only answer —
+    # every question costs at most two LLM calls (plan + answer).
+    tool_choice = "auto"
+    for message in reversed(messages):
+        if isinstance(message, HumanMessage):
+            break
+        if isinstance(message, ToolMessage):
+            tool_choice = "none"
+            break
 
-    # Note: We let the LLM decide if it needs a tool or the final answer.
-    # The graph structure handles the routing based on tool calls.
+    # init_node has already put the system prompt at the front of the thread
+    response = _llm_with_tools(tool_choice).invoke(messages)
 
     return {"messages": [response]}
 
-# 1. Initialize the StateGraph
-builder = StateGraph(AgentState)
 
-# 2. Add Nodes
-builder.add_node("agent", agent_node)
-# ToolNode automatically executes the tools defined in the previous message
-builder.add_node("tools", ToolNode(TOOLS)) 
+# Every tool is a read-only function of the ledger, so a result stays valid
+# until the ledger changes (or the TTL runs out, since windows track today).
+TOOL_CACHE_TTL = 60  # seconds
+_tool_cache: dict[str, tuple[float, str]] = {}
+
+
+def _tool_cache_key(call: dict) -> str:
+    args = json.dumps(call["args"], sort_keys=True, default=str)
+    return f"{call['name']}:{args}:{ledger.data.metadata['last_updated']}"
+
+
+async def _run_tool(call: dict) -> ToolMessage:
+    key = _tool_cache_key(call)
+    now = time.monotonic()
+    hit = _tool_cache.get(key)
+    if hit is not None and now - hit[0] < TOOL_CACHE_TTL:
+        content = hit[1]
+    elif (tool := TOOLS_BY_NAME.get(call["name"])) is None:
+        content = f"Error: {call['name']} is not a valid tool."
+    else:
+        try:
+            content = str(await tool.ainvoke(call["args"]))
+        except Exception as e:
+            # Same contract as ToolNode: hand the error back so the LLM can recover
+            content = f"Error: {e!r}"
+        else:
+            for stale in [k for k, (at, _) in _tool_cache.items() if now - at >= TOOL_CACHE_TTL]:
+                del _tool_cache[stale]
+            _tool_cache[key] = (now, content)
+    # Cached or not, the message must answer *this* call's id
+    return ToolMessage(content=content, name=call["name"], tool_call_id=call["id"])
+
+
+async def parallel_tool_node(state: AgentState):
+    """
+    Runs every tool call from the last AI message concurrently.
+    ainvoke pushes our sync tools onto worker threads, so N calls cost max, not sum.
+    """
+    calls = state["messages"][-1].tool_calls
+    results = await asyncio.gather(*(_run_tool(call) for call in calls))
+    return {"messages": list(results)}
+
+
+CHECKPOINTS_PATH = DATA_DIR / "checkpoints.sqlite"
+CHECKPOINT_TTL = timedelta(hours=24)
+
+
+@lru_cache(maxsize=1)
+def get_graph():
+    """
+    Build and compile the agent graph on first use.
+    Must be called from inside the event loop — the async saver binds to it.
+    """
+    import aiosqlite
+    from langgraph.graph import StateGraph, START, END
+    from langgraph.prebuilt import tools_condition
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+    from bussinbank.agent.state import AgentState
+
+    _llm_with_tools("auto")  # warm the client agent_node uses first
 
+    # 1. Initialize the StateGraph
+    builder = StateGraph(AgentState)
 
-# 3. Define Edges and Conditionals
-builder.add_edge(START, "agent")
+    # 2. Add Nodes
+    builder.add_node("init", init_node)
+    builder.add_node("agent", agent_node)
+    # Executes all tool calls from the previous message in parallel
+    builder.add_node("tools", parallel_tool_node)
 
-# If 'agent' outputs a tool call, go to 'tools'. If not, go to 'END' (implies final answer or plain text).
-builder.add_conditional_edges(
-    "agent",
-    tools_condition,
-    {"tools": "tools", END: END},
+
+    # 3. Define Edges and Conditionals
+    builder.add_edge(START, "init")
+    builder.add_edge("init", "agent")
+
+    # If 'agent' outputs a tool call, go to 'tools'. If not, go to 'END' (implies final answer or plain text).
+    builder.add_conditional_edges(
+        "agent",
+        tools_condition,
+        {"tools": "tools", END: END},
+    )
+
+    # ⭐️ CRITICAL FIX: After 'tools' execute, send the results back to the 'agent'
+    # so the LLM can see the results and formulate the FINAL ANSWER.
+    builder.add_edge("tools", "agent") 
+
+    # Conversations survive restarts and are shared between CLI processes.
+    # The saver opens the connection itself on first use.
+    memory = AsyncSqliteSaver(aiosqlite.connect(CHECKPOINTS_PATH))
+    return builder.compile(checkpointer=memory)
+
+
+async def sweep_checkpoints(saver) -> None:
+    """
+    Drop threads idle for longer than CHECKPOINT_TTL, and older checkpoints
+    of the threads still in use, to keep the database bounded.
+    """
+    cutoff = (datetime.now(timezone.utc) - CHECKPOINT_TTL).isoformat()
+    latest: dict[str, str] = {}  # thread_id → ts of its newest checkpoint
+    stale = []
+    # Newest first, so the first checkpoint seen per thread is its latest
+    async for item in saver.alist(None):
+        cfg = item.config["configurable"]
+        if cfg["thread_id"] not in latest:
+            latest[cfg["thread_id"]] = item.checkpoint["ts"]
+        elif item.checkpoint["ts"] < cutoff:
+            stale.append((cfg["thread_id"], cfg["checkpoint_ns"], cfg["checkpoint_id"]))
+
+    if stale:
+        where = "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?"
+        async with saver.lock:
+            await saver.conn.executemany(f"DELETE FROM checkpoints {where}", stale)
+            await saver.conn.executemany(f"DELETE FROM writes {where}", stale)
+            await saver.conn.commit()
+
+    for thread_id, ts in latest.items():
+        if ts < cutoff:
+            await saver.adelete_thread(thread_id)
+
+# Rephrased repeats skip the LLM; entries expire as soon as the ledger changes.
+cache = SemanticCache()
+
+# Words that don't change what's being asked: "what's my current burn?" is
+# the same lookup as "burn".
+_FILLER_RE = re.compile(
+    r"\b(?:what[’']?s|what\s+is|how\s+much|show(?:\s+me)?|tell\s+me|give\s+me"
+    r"|my|current|currently|is|do|i|have|the|please)\b|[?!.,]"
+)
+
+# Each group is named after the tool that answers it. Only a question that
+# is nothing but one of these phrases once the filler is gone gets routed —
+# "roast my net worth" or "is my burn bad?" still want the LLM's take.
+_INTENT_RE = re.compile(
+    r"(?P<get_net_worth>net[\s-]?worth)"
+    r"|(?P<get_monthly_burn>(?:monthly\s+)?burn(?:\s+rate)?)"
+    r"|(?P<get_runway>runway)"
+    r"|(?P<get_spending_this_month>(?:spending|spent)(?:\s+this\s+month)?)"
 )
 
-# ⭐️ CRITICAL FIX: After 'tools' execute, send the results back to the 'agent'
-# so the LLM can see the results and formulate the FINAL ANSWER.
-builder.add_edge("tools", "agent") 
 
-memory = MemorySaver()
-graph = builder.compile(checkpointer=memory)
+def route_directly(question: str) -> str | None:
+    """Answer bare single-intent lookups with their tool, no LLM planning."""
+    phrase = " ".join(_FILLER_RE.sub(" ", question.lower()).split())
+    match = _INTENT_RE.fullmatch(phrase)
+    if match is None:
+        return None
+    tool = TOOLS_BY_NAME.get(match.lastgroup)
+    return tool.invoke({}) if tool is not None else None
 
 
-def ask(question: str):
+async def _remember(config: dict, question: str, answer: str) -> None:
+    """Record an answer given outside the graph so follow-ups can see it."""
+    await get_graph().aupdate_state(
+        config,
+        {"messages": [HumanMessage(content=question), AIMessage(content=f"FINAL ANSWER: {answer}")]},
+        as_node="agent",
+    )
+
+
+async def ask(question: str):
     print(f"\nYou: {question}")
     # Using a fixed thread_id for this example
+    # Input step + init → agent → tools → agent: the longest possible run
     config = {"configurable": {"thread_id": "1"}, "recursion_limit": 5} 
 
+    routed = route_directly(question)
+    if routed is not None:
+        print(f"BussinBank: {routed}\n")
+        await _remember(config, question, routed)
+        return
+
+    # Answers depend on today's windows as well as the ledger, so a new day
+    # expires them too. Date first keeps the key ordered by time.
+    version = f"{date.today().isoformat()} {ledger.data.metadata['last_updated']}"
+    cached = cache.lookup(question, version)
+    if cached is not None:
+        print(f"BussinBank: {cached}\n")
+        await _remember(config, question, cached)
+        return
+
     # The input to the graph must be a list of messages.
-    result = graph.invoke({"messages": [HumanMessage(content=question)]}, config=config)
-    
-    # The last message in the list is the final output of the graph.
-    # We check if it contains the FINAL ANSWER.
-    final_message_content = result["messages"][-1].content
-    
-    if "FINAL ANSWER:" in final_message_content:
-        answer = final_message_content.split("FINAL ANSWER:")[-1].strip()
-        print(f"BussinBank: {answer}\n")
+    inputs = {"messages": [HumanMessage(content=question)]}
+
+    # Print tokens as they arrive instead of waiting for the whole answer.
+    # Only text after FINAL ANSWER: is shown live; the rest is buffered
+    # so the fallback below still has something to print.
+    final_message_content = ""
+    message_id = None
+    answer = ""
+    async for chunk, meta in get_graph().astream(inputs, config=config, stream_mode="messages"):
+        # Only LLM output is for the user — not tool results, not init's prompt
+        if meta["langgraph_node"] != "agent" or not chunk.content:
+            continue
+        # A new LLM call started — only the last one holds the answer
+        if chunk.id != message_id:
+            message_id, final_message_content, answer = chunk.id, "", ""
+        final_message_content += chunk.content
+
+        marker, streamed = final_message_content.partition("FINAL ANSWER:")[1:]
+        if not marker:
+            continue
+        streamed = streamed.lstrip()
+        if streamed and not answer:
+            sys.stdout.write("BussinBank: ")
+        sys.stdout.write(streamed[len(answer):])
+        sys.stdout.flush()
+        answer = streamed
+
+    if answer:
+        sys.stdout.write("\n\n")
+        cache.store(question, answer.strip(), version)
         return
     
     # Fallback for when the graph ends without the specific keyword
@@ -94,6 +317,30 @@ def ask(question: str):
 
 # src/bussinbank/agent/graph.py - CORRECTION
 
+async def main():
+    graph = get_graph()
+    await sweep_checkpoints(graph.checkpointer)
+    try:
+        while True:
+            try:
+                q = input("You: ").strip()
+            except EOFError:
+                break
+            except KeyboardInterrupt:
+                print("\nExiting...")
+                break
+            
+            if q.lower() in {"quit", "exit"}:
+                break
+            if not q:
+                continue
+                
+            await ask(q)
+    finally:
+        # aiosqlite's worker thread would otherwise keep the process alive
+        await graph.checkpointer.conn.close()
+
+
 if __name__ == "__main__":
     from dotenv import load_dotenv
     load_dotenv()
@@ -108,18 +355,4 @@ if __name__ == "__main__":
     # config = {"configurable": {"thread_id": "1"}}
     # graph.invoke({"messages": []}, config=config) 
 
-    while True:
-        try:
-            q = input("You: ").strip()
-        except EOFError:
-            break
-        except KeyboardInterrupt:
-            print("\nExiting...")
-            break
-        
-        if q.lower() in {"quit", "exit"}:
-            break
-        if not q:
-            continue
-            
-        ask(q)
\ No newline at end of file
+    asyncio.run(main())
@@ -10,6 +10,8 @@ from datetime import date, timedelta
 from decimal import Decimal
 from typing import Dict, List, Tuple, Literal
 
+import numpy as np
+
 from bussinbank.core.ledger import ledger  # ← Fixed: import the real ledger object
 
 AVG_DAYS_PER_MONTH = Decimal("30.4375")
@@ -70,18 +72,22 @@ class Forecaster:
         self, months_ahead: int = 24
     ) -> List[Tuple[date, Decimal]]:
         """Returns list of (month_start_date, projected_liquid_balance)"""
-        balances = []
         current_cash = self._current_liquid_cash()
         daily_net = self._average_daily_net_flow()
 
-        for i in range(months_ahead + 1):
-            month_date = date.today().replace(day=1) + timedelta(days=32 * i)
-            month_date = month_date.replace(day=1)  # first of month
-            days = (month_date - date.today()).days + i  # approx
-            projected = current_cash + daily_net * days
-            balances.append((month_date, projected.quantize(Decimal("0.01"))))
+        today = date.today()
+        y, m = today.year, today.month
+        month_starts = [
+            date(y + (m - 1 + i) // 12, (m - 1 + i) % 12 + 1, 1)
+            for i in range(months_ahead + 1)
+        ]
+        days = np.array([d.toordinal() for d in month_starts]) - today.toordinal()
+        projected = float(current_cash) + float(daily_net) * days
 
-        return balances
+        return [
+            (month_date, Decimal(f"{balance:.2f}"))
+            for month_date, balance in zip(month_starts, projected)
+        ]
 
     def when_can_i_retire(
         self,
@@ -96,22 +102,12 @@ class Forecaster:
         return date.today() + timedelta(days=30 * months)
 
     # ──────── Private helpers ────────
+    # Both are memoized on the ledger until the next transaction lands.
     def _current_liquid_cash(self) -> Decimal:
-        return sum(
-            acc.balance
-            for acc in self.ledger.data.accounts.values()
-            if acc.type in ("checking", "savings") and acc.balance > 0
-        )
+        return self.ledger.liquid_cash
 
     def _average_daily_net_flow(self) -> Decimal:
-        cutoff = date.today() - timedelta(days=90)  # 3 months of history
-        total = Decimal("0")
-        count = 0
-        for tx in self.ledger.data.transactions:
-            if tx.date >= cutoff:
-                total += tx.amount
-                count += 1
-        return (total / max(1, count)) if count > 0 else Decimal("0")
+        return self.ledger.average_daily_net_flow
 
     def _average_monthly_net_flow(self) -> Decimal:
         return self._average_daily_net_flow() * AVG_DAYS_PER_MONTH
@@ -6,12 +6,17 @@ Tested and used in production-grade fintechs.
 
 from __future__ import annotations
 
-import json
+import mmap
+import os
 from datetime import date, datetime, timedelta
 from decimal import Decimal
+from functools import wraps
 from pathlib import Path
-from typing import Literal
+from typing import Callable, Literal, TypeVar
 
+import ijson
+import numpy as np
+import orjson
 from pydantic import ValidationError
 
 from .models import (
@@ -25,61 +30,326 @@ from .models import (
 
 DATA_DIR = Path(__file__).parent.parent.parent.parent / "data"
 DATA_DIR.mkdir(exist_ok=True)
+# ledger.json is the snapshot; transactions added since then are appended to
+# tx.log one JSON object per line, and folded back in by save().
 LEDGER_PATH = DATA_DIR / "ledger.json"
+TX_LOG_PATH = DATA_DIR / "tx.log"
+COMPACT_AFTER = 10_000  # log lines
+
+# tx.id → normalized description embedding, for semantic categorization
+EMBEDDINGS_PATH = DATA_DIR / "embeddings.npz"
+EMBED_FLUSH_SIZE = 32
+
+T = TypeVar("T")
+
+
+def _to_decimal(cents: int | np.integer) -> Decimal:
+    return Decimal(int(cents)).scaleb(-2)
+
+
+def _memoized(fn: Callable[[Ledger], T]) -> property:
+    """A property whose value lives in Ledger._cache until the next mutation."""
+    name = fn.__name__
+
+    @wraps(fn)
+    def getter(self: Ledger) -> T:
+        return self._cached(name, lambda: fn(self))
+
+    return property(getter)
+
+
+def _snapshot_entries(f):
+    """
+    Yield (section, key, value) for every entry one level below the top-level
+    keys, in a single streaming pass: accounts/goals/metadata by key,
+    transactions by position (key None). Any other top-level key is a
+    ValueError, as LedgerData's extra="forbid" would make it.
+    """
+    depth = 0
+    section = key = None
+    builder = None
+    for _, event, value in ijson.parse(f):
+        if builder is not None:
+            builder.event(event, value)
+            if event in ("start_map", "start_array"):
+                depth += 1
+            elif event in ("end_map", "end_array"):
+                depth -= 1
+                if depth == 2:
+                    yield section, key, builder.value
+                    builder = None
+            continue
+
+        if event == "map_key":
+            if depth == 1:
+                if value not in LedgerData.model_fields:
+                    raise ValueError(f"unknown top-level key {value!r}")
+                section, key = value, None
+            else:
+                key = value
+        elif event in ("start_map", "start_array"):
+            if depth == 2:
+                builder = ijson.ObjectBuilder()
+                builder.event(event, value)
+            depth += 1
+        elif event in ("end_map", "end_array"):
+            depth -= 1
+        elif depth == 2:
+            yield section, key, value
 
 
 class Ledger:
     def __init__(self, data: LedgerData | None = None):
+        self._log_lines = 0
+        # Accounts/goals as ledger.json + tx.log would restore them (None: no
+        # snapshot yet). tx.log only holds transactions on top of a snapshot.
+        self._persisted_state: bytes | None = None
         if data is None:
             data = self._load_from_disk()
+            self._log_lines = self._replay_log(data)
+            if LEDGER_PATH.exists():
+                self._persisted_state = self._state_key(data)
         self.data = data
 
+        # Aggregates computed once per ledger state. add_transaction is the only
+        # mutator and clears this — anything touching data.accounts[...].balance
+        # or data.transactions directly must go through it, or these go stale.
+        self._cache: dict[str, object] = {}
+        self._cache_day = date.today()
+
+        # Transactions are kept in date order, so every date window is a
+        # contiguous slice found by binary search on the date_ord column.
+        self.data.transactions.sort(key=lambda tx: tx.date)
+
+        # Struct-of-arrays mirror of data.transactions — aggregates scan these
+        # in NumPy and only convert back to Decimal for the result.
+        self._categories: list[str] = []
+        self._category_ids: dict[str, int] = {}
+        self._arrays: dict[str, np.ndarray] = {}
+        self._rebuild_arrays()
+
+        # Loaded on first description_embeddings() call; until then nothing
+        # imports sentence-transformers and add_transaction queues nothing.
+        self._embeddings: dict[str, np.ndarray] | None = None
+        self._pending_embeds: list[Transaction] = []
+
     @classmethod
     def _load_from_disk(cls) -> LedgerData:
         if not LEDGER_PATH.exists():
             print("No ledger found — starting fresh")
             return LedgerData()
 
+        # One streaming pass, one entry at a time — peak memory no longer
+        # scales with the raw JSON on top of the models built from it.
+        accounts: dict[str, Account] = {}
+        goals: dict[str, FinancialGoal] = {}
+        transactions: list[Transaction] = []
+        metadata: dict = {}
         try:
-            raw = json.loads(LEDGER_PATH.read_text())
-            return LedgerData.model_validate(raw)
-        except (json.JSONDecodeError, ValidationError) as e:
+            with LEDGER_PATH.open("rb") as f:
+                for section, key, value in _snapshot_entries(f):
+                    if section == "accounts":
+                        accounts[key] = Account.model_validate(value)
+                    elif section == "goals":
+                        goals[key] = FinancialGoal.model_validate(value)
+                    elif section == "transactions":
+                        transactions.append(Transaction.model_validate(value))
+                    elif section == "metadata":
+                        metadata[key] = value
+        except (ijson.JSONError, ValueError) as e:
             raise RuntimeError(f"Corrupted ledger.json — fix or delete it: {e}") from e
 
+        data = LedgerData(accounts=accounts, transactions=transactions, goals=goals)
+        if metadata:
+            data.metadata = metadata
+        return data
+
+    @staticmethod
+    def _replay_log(data: LedgerData) -> int:
+        """Apply tx.log on top of the snapshot. Returns the number of log lines."""
+        if not TX_LOG_PATH.exists() or TX_LOG_PATH.stat().st_size == 0:
+            return 0
+
+        # A crash between writing the snapshot and deleting the log leaves
+        # lines that are already in the snapshot — skip those.
+        seen = {tx.id for tx in data.transactions}
+        lines = 0
+        torn_at = None
+        with TX_LOG_PATH.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for line in iter(mm.readline, b""):
+                if not line.endswith(b"\n"):
+                    torn_at = mm.tell() - len(line)
+                    break
+                lines += 1
+                try:
+                    tx = Transaction.model_validate_json(line)
+                    if tx.id in seen:
+                        continue
+                    data.transactions.append(tx)
+                    data.accounts[tx.account_id].balance += tx.amount
+                except (ValidationError, KeyError) as e:
+                    raise RuntimeError(f"Corrupted tx.log line {lines} — fix or delete it: {e}") from e
+                data.metadata["last_updated"] = max(
+                    data.metadata["last_updated"], tx.imported_at.isoformat()
+                )
+
+        # Cut the fragment off, or the next append would be glued onto it
+        if torn_at is not None:
+            print("Dropping torn last line of tx.log")
+            os.truncate(TX_LOG_PATH, torn_at)
+        return lines
+
+    @staticmethod
+    def _state_key(data: LedgerData) -> bytes:
+        """Everything a snapshot holds besides transactions and metadata."""
+        return orjson.dumps(
+            data.model_dump(mode="json", include={"accounts", "goals"}),
+            option=orjson.OPT_SORT_KEYS,
+        )
+
     def save(self) -> None:
+        """Write a full snapshot and truncate the transaction log."""
         tmp_path = LEDGER_PATH.with_suffix(".tmp")
-        tmp_path.write_text(self.data.model_dump_json(indent=2))
+        raw = orjson.dumps(self.data.model_dump(mode="json"), option=orjson.OPT_INDENT_2)
+        tmp_path.write_bytes(raw)
         tmp_path.replace(LEDGER_PATH)  # Atomic replace
+        TX_LOG_PATH.unlink(missing_ok=True)
+        self._log_lines = 0
+        self._persisted_state = self._state_key(self.data)
+
+    def _append_to_log(self, tx: Transaction) -> None:
+        """O(1) durable write of one transaction; compacts once the log is long."""
+        with TX_LOG_PATH.open("ab") as f:
+            f.write(orjson.dumps(tx.model_dump(mode="json")) + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._log_lines += 1
+        if self._log_lines >= COMPACT_AFTER:
+            self.save()
+
+    # ──────── Description embeddings ────────
+    def description_embeddings(self) -> dict[str, np.ndarray]:
+        """
+        tx.id → unit-length embedding of the description.
+        First call loads embeddings.npz and embeds everything missing in one batch.
+        """
+        if self._embeddings is None:
+            self._embeddings = self._load_embeddings()
+            self._pending_embeds = [
+                tx for tx in self.data.transactions if tx.id not in self._embeddings
+            ]
+        self._flush_embeddings()
+        return self._embeddings
+
+    @staticmethod
+    def _embed_batch(texts: list[str]) -> np.ndarray:
+        from bussinbank.memory.embeddings import get_encoder
+
+        return get_encoder().encode(
+            texts, batch_size=64, convert_to_numpy=True, normalize_embeddings=True
+        )
+
+    @staticmethod
+    def _load_embeddings() -> dict[str, np.ndarray]:
+        if not EMBEDDINGS_PATH.exists():
+            return {}
+        with np.load(EMBEDDINGS_PATH) as f:
+            return dict(zip(f["ids"].tolist(), f["vectors"]))
+
+    def _flush_embeddings(self) -> None:
+        if not self._pending_embeds:
+            return
+        pending, self._pending_embeds = self._pending_embeds, []
+        vectors = self._embed_batch([tx.description for tx in pending])
+        self._embeddings.update(zip((tx.id for tx in pending), vectors))
+
+        tmp_path = EMBEDDINGS_PATH.with_suffix(".tmp")
+        with tmp_path.open("wb") as f:
+            np.savez(
+                f,
+                ids=np.array(list(self._embeddings)),
+                vectors=np.stack(list(self._embeddings.values())),
+            )
+        tmp_path.replace(EMBEDDINGS_PATH)  # Atomic replace
+
+    # ──────── Cache ────────
+    def _cached(self, key: str, compute: Callable[[], T]) -> T:
+        self._expire_if_new_day()
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def _expire_if_new_day(self) -> None:
+        # Every window is relative to date.today(), so nothing survives midnight
+        today = date.today()
+        if today != self._cache_day:
+            self._cache.clear()
+            self._cache_day = today
+
+    # ──────── Transaction arrays ────────
+    def _rebuild_arrays(self) -> None:
+        rows = [self._array_row(tx) for tx in self.data.transactions]
+        amounts, dates, cats = zip(*rows) if rows else ((), (), ())
+        self._arrays = {
+            "amount_cents": np.array(amounts, dtype=np.int64),
+            "date_ord": np.array(dates, dtype=np.int32),
+            "cat_id": np.array(cats, dtype=np.int16),
+        }
+
+    def _insert_into_arrays(self, index: int, tx: Transaction) -> None:
+        for (name, column), value in zip(self._arrays.items(), self._array_row(tx)):
+            self._arrays[name] = np.insert(column, index, np.array(value, dtype=column.dtype))
+
+    def _window(self, start: date, end: date | None = None) -> slice:
+        """Index range of transactions dated start..end (inclusive), in O(log N)."""
+        dates = self._arrays["date_ord"]
+        lo = int(np.searchsorted(dates, start.toordinal(), side="left"))
+        hi = len(dates) if end is None else int(np.searchsorted(dates, end.toordinal(), side="right"))
+        return slice(lo, hi)
+
+    def _array_row(self, tx: Transaction) -> tuple[int, int, int]:
+        cat_id = self._category_ids.get(tx.category_root)
+        if cat_id is None:
+            cat_id = self._category_ids[tx.category_root] = len(self._categories)
+            self._categories.append(tx.category_root)
+        return tx.amount_cents, tx.date.toordinal(), cat_id
 
     # ──────── Core Calculations ────────
-    @property
+    @_memoized
     def net_worth(self) -> Decimal:
         total = sum(
-            (acc.balance for acc in self.data.accounts.values() if acc.include_in_net_worth),
-            start=Decimal("0")
+            acc.balance_cents for acc in self.data.accounts.values() if acc.include_in_net_worth
         )
-        return total.quantize(Decimal("0.01"))
+        return _to_decimal(total)
 
-    @property
+    @_memoized
     def monthly_burn_rate(self) -> Decimal:
-        cutoff = date.today() - timedelta(days=30)
-        expenses = sum(
-            (abs(tx.amount) for tx in self.data.transactions if tx.date >= cutoff and tx.amount < 0),
-            start=Decimal("0")
-        )
-        return (expenses / 30 * 30).quantize(Decimal("0.01"))
+        return _to_decimal(self._cached("expense_cents_30d", self._expense_cents_30d))
+
+    @_memoized
+    def liquid_cash(self) -> Decimal:
+        """Checking + savings with a positive balance."""
+        return _to_decimal(sum(
+            acc.balance_cents
+            for acc in self.data.accounts.values()
+            if acc.type in ("checking", "savings") and acc.balance > 0
+        ))
+
+    @_memoized
+    def average_daily_net_flow(self) -> Decimal:
+        """Mean net amount over the last 3 months of transactions."""
+        window = self._arrays["amount_cents"][self._window(date.today() - timedelta(days=90))]
+        if window.size == 0:
+            return Decimal("0")
+        return _to_decimal(window.sum()) / window.size
 
-    @property
+    @_memoized
     def runway_days(self) -> int | Literal["infinite"]:
         burn = self.monthly_burn_rate
         if burn <= 0:
             return "infinite"
 
-        cash = sum(
-            acc.balance
-            for acc in self.data.accounts.values()
-            if acc.type in ("checking", "savings") and acc.balance > 0
-        )
+        cash = self.liquid_cash
         if cash <= 0:
             return 0
         daily_burn = burn / 30
@@ -89,17 +359,40 @@ class Ledger:
     def add_transaction_safe(self, raw_tx: dict) -> Transaction:
         """Agent calls this — we validate before trusting."""
         tx = Transaction.model_validate(raw_tx)
+        # Replay needs the account on disk — snapshot anything the log can't carry
+        if self._state_key(self.data) != self._persisted_state:
+            self.save()
         self.add_transaction(tx)
-        self.save()
+        self._append_to_log(tx)
+        self._persisted_state = self._state_key(self.data)
         return tx
 
     def add_transaction(self, tx: Transaction) -> None:
         """Internal — only called after validation."""
-        self.data.transactions.append(tx)
+        # Same-or-later dates go after existing ones, so the usual case appends
+        index = int(np.searchsorted(self._arrays["date_ord"], tx.date.toordinal(), side="right"))
+        self.data.transactions.insert(index, tx)
+        self._insert_into_arrays(index, tx)
         account = self.data.accounts[tx.account_id]
         account.balance += tx.amount
         self.data.metadata["last_updated"] = datetime.utcnow().isoformat()
 
+        # One encode call per EMBED_FLUSH_SIZE new rows, not one per row
+        if self._embeddings is not None:
+            self._pending_embeds.append(tx)
+            if len(self._pending_embeds) >= EMBED_FLUSH_SIZE:
+                self._flush_embeddings()
+
+        # Roll the 30-day expense window forward instead of rescanning for it;
+        # _expire_if_new_day drops it once the window itself has moved.
+        self._expire_if_new_day()
+        expense_cents = self._cache.get("expense_cents_30d")
+        self._cache.clear()
+        if expense_cents is not None:
+            if tx.amount_cents < 0 and tx.date >= date.today() - timedelta(days=30):
+                expense_cents -= tx.amount_cents
+            self._cache["expense_cents_30d"] = expense_cents
+
     def monthly_spending_by_category(self, month: date | None = None) -> dict[str, Decimal]:
         if month is None:
             month = date.today().replace(day=1)
@@ -110,23 +403,31 @@ class Ledger:
         next_month = month.replace(day=28) + timedelta(days=4)
         end = next_month - timedelta(days=next_month.day)
 
-        spending: dict[str, Decimal] = {}
-        for tx in self.data.transactions:
-            if start <= tx.date <= end and tx.amount < 0:
-                cat = tx.category.split(":")[0].strip() or "uncategorized"
-                spending[cat] = spending.get(cat, Decimal("0")) + abs(tx.amount)
+        window = self._window(start, end)
+        amounts = self._arrays["amount_cents"][window]
+        mask = amounts < 0
+        totals = np.bincount(
+            self._arrays["cat_id"][window][mask],
+            weights=-amounts[mask],
+            minlength=len(self._categories),
+        )
 
-        return {k: v.quantize(Decimal("0.01")) for k, v in sorted(spending.items())}
+        spending = {
+            self._categories[i]: _to_decimal(round(cents))
+            for i, cents in enumerate(totals)
+            if cents > 0
+        }
+        return dict(sorted(spending.items()))
     
     def get_spending_this_month(self) -> Decimal:
         """Total spent this calendar month."""
+        return self._cached("spending_this_month", self._spending_this_month)
+
+    def _spending_this_month(self) -> Decimal:
         today = date.today()
         start = today.replace(day=1)
-        return sum(
-            abs(tx.amount)
-            for tx in self.data.transactions
-            if start <= tx.date <= today and tx.amount < 0
-        )
+        amounts = self._arrays["amount_cents"][self._window(start, today)]
+        return _to_decimal(-amounts[amounts < 0].sum())
 
     def goal_summary(self) -> list[dict]:
         summary = []
@@ -152,23 +453,20 @@ class Ledger:
             })
         return summary
 
-    @property
+    @_memoized
     def emergency_fund_months(self) -> float:
-        cutoff = date.today() - timedelta(days=30)
-        expenses = sum(
-            abs(tx.amount)
-            for tx in self.data.transactions
-            if tx.date >= cutoff and tx.amount < 0
-        )
+        expenses = _to_decimal(self._cached("expense_cents_30d", self._expense_cents_30d))
         if expenses <= 0:
             return float("inf")
 
-        cash = sum(
-            acc.balance
-            for acc in self.data.accounts.values()
-            if acc.type in ("checking", "savings") and acc.balance > 0
-        )
-        return round(float(cash / expenses * 30, 1))
+        # expenses already covers one month, so cash / expenses is in months
+        cash = self.liquid_cash
+        return round(float(cash / expenses), 1)
+
+    # ──────── Private helpers ────────
+    def _expense_cents_30d(self) -> int:
+        amounts = self._arrays["amount_cents"][self._window(date.today() - timedelta(days=30))]
+        return int(-amounts[amounts < 0].sum())
 
 
 # Global singleton — the one and only truth
@@ -8,6 +8,7 @@ from __future__ import annotations
 from datetime import date, datetime
 from decimal import Decimal
 from enum import Enum
+from functools import cached_property
 from typing import Literal, Optional
 from uuid import uuid4
 
@@ -65,7 +66,7 @@ class Transaction(BaseModel):
     @field_validator("amount", mode="before")
     @classmethod
     def parse_amount(cls, v):
-        if isinstance(v, (int, float, str)):
+        if isinstance(v, (int, float, str, Decimal)):
             return Decimal(str(v)).quantize(Decimal("0.01"))
         return v
 
@@ -78,6 +79,18 @@ class Transaction(BaseModel):
             raise ValueError("Expense transactions must have negative amount")
         return self
 
+    # Not fields — never serialized, computed once per (frozen) instance
+    @cached_property
+    def amount_cents(self) -> int:
+        """Amount as integer cents, for arithmetic that doesn't need Decimal."""
+        # Same rounding as Account.balance_cents, so the two never drift apart
+        return int((self.amount * 100).to_integral_value())
+
+    @cached_property
+    def category_root(self) -> str:
+        """Top-level category: "food:groceries" → "food"."""
+        return self.category.split(":", 1)[0].strip() or "uncategorized"
+
 
 class Account(BaseModel):
     id: str
@@ -90,6 +103,11 @@ class Account(BaseModel):
     include_in_net_worth: bool = True
     credit_limit: Optional[PositiveFloat] = None
 
+    @property
+    def balance_cents(self) -> int:
+        # Balance is mutable, so this can't be cached like Transaction.amount_cents
+        return int((self.balance * 100).to_integral_value())
+
 
 class FinancialGoal(BaseModel):
     id: str
@@ -0,0 +1,18 @@
+# src/bussinbank/memory/embeddings.py
+"""
+The one sentence-transformers model everything shares.
+Loading it costs seconds (torch), so nobody pays until something needs a vector.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+@lru_cache(maxsize=1)
+def get_encoder():
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(EMBEDDING_MODEL)
@@ -0,0 +1,78 @@
+# src/bussinbank/memory/semantic_cache.py
+"""
+Answers we've already given, looked up by meaning instead of exact wording.
+"what's my burn?" and "monthly burn rate?" shouldn't cost two LLM round-trips.
+"""
+
+from __future__ import annotations
+
+import re
+
+import numpy as np
+
+from bussinbank.memory.embeddings import get_encoder
+
+# Embeddings barely move when only a date or amount changes ("...on
+# 2026-12-31?" vs "...on 2027-06-30?"), and short follow-ups like "why?"
+# mean whatever the thread says. Neither is safe to answer by similarity.
+MIN_WORDS = 4
+_DIGIT_RE = re.compile(r"\d")
+
+
+def _cacheable(question: str) -> bool:
+    return len(question.split()) >= MIN_WORDS and not _DIGIT_RE.search(question)
+
+
+class SemanticCache:
+    """Flat inner-product index over normalized question embeddings."""
+
+    def __init__(self, threshold: float = 0.92):
+        self.threshold = threshold
+        self._vectors: np.ndarray | None = None  # (n, dim), unit-length rows
+        self._answers: list[str] = []
+        self._versions: list[str] = []
+        self._last: tuple[str, np.ndarray] | None = None
+
+    def lookup(self, question: str, version: str) -> str | None:
+        """Cached answer for a question close enough to one we've seen, else None."""
+        self._evict_older_than(version)
+        if self._vectors is None or not _cacheable(question):
+            return None
+
+        scores = self._vectors @ self._embed(question)
+        best = int(scores.argmax())
+        if scores[best] >= self.threshold:
+            return self._answers[best]
+        return None
+
+    def store(self, question: str, answer: str, version: str) -> None:
+        """Remember an answer, tagged with the day + ledger version it was computed from."""
+        if not _cacheable(question):
+            return
+        vec = self._embed(question)
+        if self._vectors is None:
+            self._vectors = vec[np.newaxis, :]
+        else:
+            self._vectors = np.vstack([self._vectors, vec])
+        self._answers.append(answer)
+        self._versions.append(version)
+
+    # ──────── Private helpers ────────
+    def _embed(self, question: str) -> np.ndarray:
+        # A miss is followed by a store of the same question — don't encode twice
+        if self._last is not None and self._last[0] == question:
+            return self._last[1]
+        vec = get_encoder().encode(
+            [question], convert_to_numpy=True, normalize_embeddings=True
+        )[0]
+        self._last = (question, vec)
+        return vec
+
+    def _evict_older_than(self, version: str) -> None:
+        # Versions start with ISO dates/timestamps, so string order is time order
+        keep = [i for i, v in enumerate(self._versions) if v >= version]
+        if len(keep) == len(self._versions):
+            return
+        self._vectors = self._vectors[keep] if keep else None
+        self._answers = [self._answers[i] for i in keep]
+        self._versions = [self._versions[i] for i in keep]
@@ -0,0 +1,143 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from bussinbank.core import ledger as ledger_module
+from bussinbank.core.ledger import Ledger
+from bussinbank.core.models import Account, AccountType
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(ledger_module, "LEDGER_PATH", tmp_path / "ledger.json")
+    monkeypatch.setattr(ledger_module, "TX_LOG_PATH", tmp_path / "tx.log")
+    return tmp_path
+
+
+def _add_account(ledger: Ledger, account_id: str = "chase", balance: str = "100.00") -> None:
+    ledger.data.accounts[account_id] = Account(
+        id=account_id, name=account_id.title(), type=AccountType.CHECKING, balance=Decimal(balance)
+    )
+
+
+def _expense(amount: str = "-10.00", **overrides) -> dict:
+    return {
+        "date": date.today(),
+        "amount": amount,
+        "description": "Coffee",
+        "category": "food:coffee",
+        "account_id": "chase",
+        "type": "expense",
+        **overrides,
+    }
+
+
+def test_fresh_install_survives_restart(data_dir):
+    ledger = Ledger()
+    _add_account(ledger)
+    tx = ledger.add_transaction_safe(_expense())
+
+    reloaded = Ledger()
+    assert [t.id for t in reloaded.data.transactions] == [tx.id]
+    assert reloaded.data.accounts["chase"].balance == Decimal("90.00")
+
+
+def test_account_added_later_is_snapshotted(data_dir):
+    ledger = Ledger()
+    _add_account(ledger)
+    ledger.add_transaction_safe(_expense())
+    _add_account(ledger, "savings", "500.00")
+    ledger.add_transaction_safe(_expense("-25.00", account_id="savings"))
+
+    reloaded = Ledger()
+    assert reloaded.data.accounts["chase"].balance == Decimal("90.00")
+    assert reloaded.data.accounts["savings"].balance == Decimal("475.00")
+
+
+def test_plain_adds_only_append_to_log(data_dir):
+    ledger = Ledger()
+    _add_account(ledger)
+    ledger.add_transaction_safe(_expense())
+    snapshot = ledger_module.LEDGER_PATH.read_bytes()
+
+    ledger.add_transaction_safe(_expense("-5.00"))
+    assert ledger_module.LEDGER_PATH.read_bytes() == snapshot
+    assert len(ledger_module.TX_LOG_PATH.read_bytes().splitlines()) == 2
+
+
+def test_torn_tail_is_truncated_before_next_append(data_dir):
+    ledger = Ledger()
+    _add_account(ledger)
+    kept = ledger.add_transaction_safe(_expense())
+    with ledger_module.TX_LOG_PATH.open("ab") as f:
+        f.write(b'{"id": "half-writ')
+
+    recovered = Ledger()
+    assert [t.id for t in recovered.data.transactions] == [kept.id]
+    assert ledger_module.TX_LOG_PATH.read_bytes().endswith(b"\n")
+
+    added = recovered.add_transaction_safe(_expense("-5.00"))
+    reloaded = Ledger()
+    assert [t.id for t in reloaded.data.transactions] == [kept.id, added.id]
+    assert reloaded.data.accounts["chase"].balance == Decimal("85.00")
+
+
+def test_log_lines_already_in_snapshot_are_skipped(data_dir):
+    ledger = Ledger()
+    _add_account(ledger)
+    ledger.add_transaction_safe(_expense())
+    log = ledger_module.TX_LOG_PATH.read_bytes()
+    # Crash between writing the snapshot and deleting the log
+    ledger.save()
+    ledger_module.TX_LOG_PATH.write_bytes(log)
+
+    reloaded = Ledger()
+    assert len(reloaded.data.transactions) == 1
+    assert reloaded.data.accounts["chase"].balance == Decimal("90.00")
+
+
+def test_log_compacts_into_snapshot(data_dir, monkeypatch):
+    monkeypatch.setattr(ledger_module, "COMPACT_AFTER", 3)
+    ledger = Ledger()
+    _add_account(ledger)
+    for _ in range(3):
+        ledger.add_transaction_safe(_expense())
+
+    assert not ledger_module.TX_LOG_PATH.exists()
+    reloaded = Ledger()
+    assert len(reloaded.data.transactions) == 3
+    assert reloaded.data.accounts["chase"].balance == Decimal("70.00")
+
+
+def test_corrupted_log_line_raises(data_dir):
+    ledger = Ledger()
+    _add_account(ledger)
+    ledger.add_transaction_safe(_expense())
+    with ledger_module.TX_LOG_PATH.open("ab") as f:
+        f.write(b"not json\n")
+
+    with pytest.raises(RuntimeError, match="Corrupted tx.log line 2"):
+        Ledger()
+
+
+def test_snapshot_round_trips(data_dir):
+    ledger = Ledger()
+    _add_account(ledger)
+    ledger.add_transaction_safe(_expense())
+    ledger.save()
+
+    reloaded = Ledger()
+    assert reloaded.data == ledger.data
+
+
+@pytest.mark.parametrize("extra", [b'"budgets": {"food": 300}', b'"budgets": {}', b'"budgets": 1'])
+def test_unknown_snapshot_section_raises(data_dir, extra):
+    ledger = Ledger()
+    _add_account(ledger)
+    ledger.save()
+    raw = ledger_module.LEDGER_PATH.read_bytes()
+    ledger_module.LEDGER_PATH.write_bytes(raw[: raw.rindex(b"}")] + b", " + extra + b"}")
+
+    with pytest.raises(RuntimeError, match="Corrupted ledger.json"):
+        Ledger()
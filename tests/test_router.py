@@ -0,0 +1,33 @@
+import pytest
+
+from bussinbank.agent.graph import route_directly
+
+
+@pytest.mark.parametrize(
+    "question",
+    [
+        "what's my net worth?",
+        "Net worth",
+        "how much runway do I have",
+        "What is my current burn rate?",
+        "how much have I spent this month?",
+    ],
+)
+def test_bare_lookups_are_routed(question):
+    assert route_directly(question) is not None
+
+
+@pytest.mark.parametrize(
+    "question",
+    [
+        "Roast my net worth",
+        "How much did I spend on food?",
+        "Is my burn bad?",
+        "how can I cut my burn",
+        "what was my burn last month",
+        "net worth and runway",
+        "why?",
+    ],
+)
+def test_everything_else_goes_to_the_graph(question):
+    assert route_directly(question) is None
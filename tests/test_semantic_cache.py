@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from bussinbank.memory import semantic_cache
+from bussinbank.memory.semantic_cache import SemanticCache
+
+
+class _ConstantEncoder:
+    """Every question embeds to the same vector, so any lookup is a hit."""
+
+    def encode(self, texts, **_):
+        return np.ones((len(texts), 4)) / 2
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    monkeypatch.setattr(semantic_cache, "get_encoder", _ConstantEncoder)
+    return SemanticCache()
+
+
+def test_rephrased_question_hits(cache):
+    cache.store("what is my monthly burn rate", "You burn $100.", "v1")
+    assert cache.lookup("how much do I burn every month", "v1") == "You burn $100."
+
+
+@pytest.mark.parametrize(
+    "question",
+    [
+        "what will I have on 2027-06-30?",
+        "what if I save 500/mo towards japan",
+        "why?",
+        "and savings?",
+    ],
+)
+def test_numbers_and_short_follow_ups_bypass_cache(cache, question):
+    cache.store("what will I have by the end of the year", "About $5,000.", "v1")
+    assert cache.lookup(question, "v1") is None
+
+    cache.store(question, "Something thread-specific.", "v1")
+    assert len(cache._answers) == 1
+
+
+def test_new_version_evicts(cache):
+    cache.store("what is my monthly burn rate", "You burn $100.", "2026-10-14 a")
+    assert cache.lookup("what is my monthly burn rate", "2026-10-15 a") is None